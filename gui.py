@@ -17,13 +17,20 @@ __author__ = "Abdullah A. Alnajim"
 __email__ = "alnajim@protonmail.com"
 
 
+import io
 import os
 import re
 import json
+import functools
+import string
+import time
+import textwrap
 import threading
 import queue
 import platform
 import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from datetime import datetime
 from pathlib import Path
 import tkinter as tk
@@ -42,6 +49,14 @@ except Exception:
     DND_FILES = None
     TKDND_AVAILABLE = False
 
+# Optional Pillow: lets page PNGs be encoded off the render thread
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except Exception:
+    Image = None
+    PIL_AVAILABLE = False
+
 import fitz  # PyMuPDF
 
 # ---------------- CONFIG HANDLING ----------------
@@ -76,69 +91,249 @@ def save_config(cfg: dict):
 # ---------------- CORE EXTRACTION ----------------
 
 SAFE_CHARS = re.compile(r'[^A-Za-z0-9._@-]')
+_SAFE_ALLOWED = set(string.ascii_letters + string.digits + "._@-")
+_SAFE_TRANS = {cp: "-" for cp in range(128) if chr(cp) not in _SAFE_ALLOWED}
 
 def safe_name(s: str) -> str:
-    return SAFE_CHARS.sub("-", s)
+    s = s.translate(_SAFE_TRANS)
+    # The table only covers ASCII; the regex catches anything else
+    return s if s.isascii() else SAFE_CHARS.sub("-", s)
 
 def parse_page_range(pages: str | None, max_page: int) -> list[int]:
     """Parse '1,3-5,10' style ranges (1-based) -> zero-based sorted unique list."""
     if not pages:
         return list(range(max_page))
-    wanted = set()
-    for part in pages.split(","):
-        part = part.strip()
-        if not part:
-            continue
-        if "-" in part:
-            a, b = part.split("-", 1)
-            start = max(1, int(a))
-            end = min(max_page, int(b))
-            if start <= end:
-                wanted.update(range(start, end + 1))
-        else:
-            p = int(part)
-            if 1 <= p <= max_page:
-                wanted.add(p)
-    return sorted([p - 1 for p in wanted])
+    return list(_parse_page_range_cached(pages, max_page))
+
+_PAGE_SPEC_RE = re.compile(r"\s*(?:\d+\s*(?:-\s*\d+\s*)?)?(?:,\s*(?:\d+\s*(?:-\s*\d+\s*)?)?)*")
+_RANGE_RE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+@functools.lru_cache(maxsize=256)
+def _parse_page_range_cached(pages: str, max_page: int) -> tuple[int, ...]:
+    # Batch runs parse the same spec for every PDF; most share a page count.
+    if not _PAGE_SPEC_RE.fullmatch(pages):
+        raise ValueError(f"invalid page range: {pages!r}")
+    selected = bytearray(max_page)  # one flag per page, so no set/sort is needed
+    for m in _RANGE_RE.finditer(pages):
+        start = max(1, int(m[1]))
+        end = min(max_page, int(m[2] or m[1]))
+        if start <= end:
+            selected[start - 1:end] = b"\x01" * (end - start + 1)
+    return tuple(i for i, flag in enumerate(selected) if flag)
+
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+_FADVISE_MIN_BYTES = 1 << 20
+
+def _write_bytes_direct(path: Path, data) -> None:
+    """Write a whole in-memory payload with os.write, skipping Python's buffered file layer."""
+    fd = os.open(path, _WRITE_FLAGS, 0o644)
+    try:
+        view = memoryview(data)
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+        if written >= _FADVISE_MIN_BYTES and hasattr(os, "posix_fadvise"):
+            # Output is never read back; keep large files from crowding the page cache
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+# Pixmap component count -> Pillow mode
+_PIL_MODES = {1: "L", 2: "LA", 3: "RGB", 4: "RGBA"}
+IO_POOL_WORKERS = 4
+IO_MAX_PENDING = 8  # rendered pages / image batches waiting for the I/O pool (bounds memory)
+IO_WRITE_BATCH = 16  # embedded images handed to the I/O pool per submission
+
+LOG_FLUSH_EVERY = 32       # buffered routine log lines per log_cb call
+LOG_FLUSH_INTERVAL = 0.5   # seconds; slow pages still show up promptly
+
+PNG_COMPRESS_LEVEL = 6       # zlib default
+FAST_PNG_COMPRESS_LEVEL = 1  # much quicker to encode, somewhat larger files
+
+def _save_pix_png(samples: bytes, size: tuple[int, int], mode: str, out_path: Path,
+                  compress_level: int = PNG_COMPRESS_LEVEL, dpi: tuple[int, int] | None = None) -> Path:
+    """Encode raw pixmap samples as PNG and write them. Runs on the I/O pool.
+
+    MuPDF must not be called from several threads, so the page is rendered
+    and its samples copied on the caller's thread; Pillow releases the GIL
+    while deflating, which lets the next page render in the meantime.
+    Pillow 11+ wheels deflate with zlib-ng, which is markedly faster than zlib.
+    dpi is recorded in a pHYs chunk, as pix.save() does.
+    """
+    img = Image.frombuffer(mode, size, samples, "raw", mode, 0, 1)
+    buf = io.BytesIO()
+    if dpi:
+        img.save(buf, "PNG", compress_level=compress_level, dpi=dpi)
+    else:
+        img.save(buf, "PNG", compress_level=compress_level)
+    _write_bytes_direct(out_path, buf.getbuffer())
+    return out_path
+
+def _write_page_file(data: bytes, out_path: Path) -> Path:
+    _write_bytes_direct(out_path, data)
+    return out_path
+
+def _page_scan_image(doc, page) -> dict | None:
+    """If the page is nothing but one image filling it (a scan), with neither page
+    nor image rotated, return doc.extract_image() for it so the page can be
+    exported without rendering."""
+    if page.rotation:
+        return None  # the stored image is upright; the rendered page would not be
+    infos = page.get_image_info(xrefs=True)
+    if len(infos) != 1 or infos[0]["xref"] <= 0:
+        return None
+    a, b, c, d, e, f = infos[0]["transform"]
+    if b or c or a <= 0 or d <= 0:
+        return None
+    # The image must match the visible page (within a point either way): one
+    # that overflows it, or a cropbox smaller than the scan, shows only part of it.
+    bbox, tol = fitz.Rect(infos[0]["bbox"]), (-1, -1, 1, 1)
+    if not ((bbox + tol).contains(page.rect) and (page.rect + tol).contains(bbox)):
+        return None
+    if page.first_annot is not None or page.get_text("text").strip() or page.get_cdrawings():
+        return None
+    base = doc.extract_image(infos[0]["xref"])
+    if not base or base.get("smask"):
+        return None
+    return base
+
+def _write_image_batch(batch: list[tuple]) -> list[tuple]:
+    """Write (out_path, data, page_no, page_prefix, img_pos) entries; return the failures."""
+    failed = []
+    for out_path, data, page_no, page_prefix, img_pos in batch:
+        try:
+            _write_bytes_direct(out_path, data)
+        except Exception as e:
+            failed.append((page_no, page_prefix, img_pos, e))
+    return failed
+
+# Parsed documents kept open between single-file runs (e.g. re-running with
+# another DPI or page range), keyed by (path, mtime_ns, size); LRU order.
+# They are opened from the file's bytes, so no handle on the PDF stays open
+# (on Windows that would stop the user from saving or replacing the file).
+# Each entry pins its file's bytes, so the cache is bounded by their total
+# size; larger files are opened from disk and never cached.
+_DOC_CACHE: dict[tuple, fitz.Document] = {}
+_DOC_CACHE_MAX_BYTES = 256 << 20
+_DOC_CACHE_LOCK = threading.Lock()
+
+def _open_cached_doc(pdf_path: Path) -> tuple[fitz.Document, bool]:
+    """Open pdf_path, reusing an earlier parse if the file has not changed since.
+
+    Returns (doc, cached); the caller closes doc only if it is not cached.
+    """
+    st = pdf_path.stat()
+    path_key = str(pdf_path.resolve())
+    key = (path_key, st.st_mtime_ns, st.st_size)
+    with _DOC_CACHE_LOCK:
+        doc = _DOC_CACHE.pop(key, None)
+        # Drop stale parses of the same file, then the least recently used
+        stale = [k for k in _DOC_CACHE if k[0] == path_key]
+        if st.st_size <= _DOC_CACHE_MAX_BYTES:
+            used = sum(k[2] for k in _DOC_CACHE if k not in stale)
+            for k in _DOC_CACHE:
+                if used + st.st_size <= _DOC_CACHE_MAX_BYTES:
+                    break
+                if k not in stale:
+                    stale.append(k)
+                    used -= k[2]
+        for k in stale:
+            try:
+                _DOC_CACHE.pop(k).close()
+            except Exception:
+                pass
+        if st.st_size > _DOC_CACHE_MAX_BYTES:
+            return fitz.open(pdf_path), False
+        if doc is None or doc.is_closed:
+            doc = fitz.open(stream=pdf_path.read_bytes(), filetype="pdf")
+        _DOC_CACHE[key] = doc
+    return doc, True
 
 class ExtractionReport:
-    """Accumulates per-run metadata and writes JSON report at the end."""
-    def __init__(self, batch_mode: bool):
+    """Accumulates per-run metadata and writes JSON report at the end.
+
+    With stream_to set, file records are appended to the report file in that
+    folder as they arrive instead of being held in memory; write_json() then
+    only adds the trailer (errors and summary).
+    """
+    REPORT_FILENAME = "extraction_report.json"
+
+    def __init__(self, batch_mode: bool, stream_to: Path | None = None):
         self.batch_mode = batch_mode
         self.started_at = datetime.utcnow().isoformat() + "Z"
         self.files: list[dict] = []
         self.global_errors: list[str] = []
+        self._stream_to = stream_to
+        self._stream = None
+        self._stream_failed = False
+        self._file_count = 0
+        self._total_images = 0
+        self._total_pngs = 0
+        self._files_with_errors = 0
+
+    def _open_stream(self) -> bool:
+        if self._stream is not None:
+            return True
+        if self._stream_to is None or self._stream_failed:
+            return False
+        try:
+            self._stream_to.mkdir(parents=True, exist_ok=True)
+            self._stream = open(self._stream_to / self.REPORT_FILENAME, "w", encoding="utf-8")
+            header = json.dumps({"batch_mode": self.batch_mode, "started_at": self.started_at}, indent=2)
+            self._stream.write(header[:-2] + ',\n  "files": [')
+            return True
+        except Exception:
+            self._stream_failed = True
+            return False
 
     def add_file_result(self, *, input_pdf: str, total_pages: int, pages_processed: list[int],
                         images_extracted: int, page_pngs: int, errors: list[dict]):
-        self.files.append({
+        record = {
             "input": input_pdf,
             "total_pages": total_pages,
             "pages_processed": pages_processed,
             "images_extracted": images_extracted,
             "page_pngs": page_pngs,
             "errors": errors,
-        })
+        }
+        if self._open_stream():
+            try:
+                sep = "," if self._file_count else ""
+                self._stream.write(sep + "\n" + textwrap.indent(json.dumps(record, indent=2), "    "))
+            except Exception:
+                pass
+        else:
+            self.files.append(record)
+        self._file_count += 1
+        self._total_images += images_extracted
+        self._total_pngs += page_pngs
+        if errors:
+            self._files_with_errors += 1
 
     def add_global_error(self, msg: str):
         self.global_errors.append(msg)
 
+    def summary(self) -> dict:
+        return {
+            "total_images": self._total_images,
+            "total_pages_exported": self._total_pngs,
+            "files_with_errors": self._files_with_errors,
+        }
+
     def to_dict(self):
         return {
             "batch_mode": self.batch_mode,
             "started_at": self.started_at,
             "finished_at": datetime.utcnow().isoformat() + "Z",
-            "file_count": len(self.files),
+            "file_count": self._file_count,
             "files": self.files,
             "global_errors": self.global_errors,
-            "summary": {
-                "total_images": sum(f["images_extracted"] for f in self.files),
-                "total_pages_exported": sum(f["page_pngs"] for f in self.files),
-                "files_with_errors": sum(1 for f in self.files if f["errors"]),
-            }
+            "summary": self.summary(),
         }
 
-    def write_json(self, out_folder: Path, filename: str = "extraction_report.json") -> Path:
+    def write_json(self, out_folder: Path, filename: str = REPORT_FILENAME) -> Path:
+        if self._open_stream():
+            return self._finish_stream()
         try:
             out_folder.mkdir(parents=True, exist_ok=True)
             p = out_folder / filename
@@ -148,6 +343,23 @@ class ExtractionReport:
         except Exception:
             return out_folder / filename
 
+    def _finish_stream(self) -> Path:
+        p = self._stream_to / self.REPORT_FILENAME
+        trailer = json.dumps({
+            "finished_at": datetime.utcnow().isoformat() + "Z",
+            "file_count": self._file_count,
+            "global_errors": self.global_errors,
+            "summary": self.summary(),
+        }, indent=2)
+        try:
+            self._stream.write("\n  ],\n" + trailer[2:])
+            self._stream.close()
+        except Exception:
+            pass
+        self._stream = None
+        self._stream_to = None
+        return p
+
 def extract_single_pdf(
     *,
     pdf_path: Path,
@@ -160,16 +372,30 @@ def extract_single_pdf(
     progress_cb_pages,   # (cur_page_index, total_pages) for this PDF
     stop_event: threading.Event | None = None,
     file_report: ExtractionReport | None = None,
+    fast_png: bool = False,
+    cache_doc: bool = False,
 ):
-    """Extract one PDF, updating per-file progress and file report."""
+    """Extract one PDF, updating per-file progress and file report.
+
+    With fast_png, page PNGs use a low compression level and scanned pages
+    (a single full-page image) are exported as that image's original bytes.
+    With cache_doc, the parsed document stays open for the next run on the
+    same unchanged file, if it fits in _DOC_CACHE_MAX_BYTES.
+    """
     output_folder.mkdir(parents=True, exist_ok=True)
+    # Names already in the output folder (plus those we create), so collision
+    # checks are set lookups instead of a stat() per candidate name.
+    existing: set[str] = set()
+    if not overwrite:
+        with os.scandir(output_folder) as it:
+            existing = {e.name for e in it}
     errors: list[dict] = []
     images_total = 0
     png_total = 0
     pages_done: list[int] = []
 
     try:
-        doc = fitz.open(pdf_path)
+        doc, cached = _open_cached_doc(pdf_path) if cache_doc else (fitz.open(pdf_path), False)
     except Exception as e:
         msg = f"❌ Failed to open PDF: {pdf_path} — {e}"
         log_cb(msg)
@@ -177,22 +403,82 @@ def extract_single_pdf(
             file_report.add_global_error(msg)
         return
 
-    page_indices = parse_page_range(pages, len(doc))
+    # Read once: the document is closed before the report entry is added
+    page_count = doc.page_count
+    page_indices = parse_page_range(pages, page_count)
     total_pages = len(page_indices)
     progress_cb_pages(0, total_pages)
-    log_cb(f"Opened: {pdf_path}  pages={len(doc)}  processing={total_pages} page(s)")
+    log_cb(f"Opened: {pdf_path}  pages={page_count}  processing={total_pages} page(s)")
+
+    # Routine per-page lines are batched into one log_cb call; warnings go
+    # out immediately (after whatever is buffered, to keep the order).
+    log_buffer: list[str] = []
+    last_flush = time.monotonic()
+
+    def _flush_log():
+        nonlocal last_flush
+        if log_buffer:
+            log_cb("\n".join(log_buffer))
+            log_buffer.clear()
+        last_flush = time.monotonic()
+
+    def _log_info(msg: str):
+        log_buffer.append(msg)
+        if len(log_buffer) >= LOG_FLUSH_EVERY:
+            _flush_log()
+
+    def _log_warn(msg: str):
+        _flush_log()
+        log_cb(msg)
+
+    # One bit per xref (they are dense and bounded by xref_length)
+    seen_xrefs = bytearray((doc.xref_length() + 7) // 8)
+
+    # Every MuPDF call (loading pages, listing/extracting images, rendering)
+    # stays on this thread: PyMuPDF documents must not be used from several
+    # threads. The overlap comes from this pool instead, which encodes and
+    # writes earlier pages' output while the next page is being decoded.
+    io_pool = ThreadPoolExecutor(max_workers=IO_POOL_WORKERS)
+    io_jobs: dict = {}  # future -> (page number, page prefix) for PNGs, None for image batches
+
+    def _collect_io(fut):
+        nonlocal png_total, images_total
+        job = io_jobs.pop(fut)
+        if job is None:
+            for page_no, prefix, img_pos, e in fut.result():
+                images_total -= 1
+                em = f"{prefix}: failed to save image {img_pos}: {e}"
+                _log_warn(f"⚠️  {em}")
+                errors.append({"page": page_no, "error": em})
+            return
+        page_no, prefix = job
+        try:
+            out_png = fut.result()
+        except Exception as e:
+            em = f"{prefix}: failed to render PNG: {e}"
+            _log_warn(f"⚠️  {em}")
+            errors.append({"page": page_no, "error": em})
+        else:
+            png_total += 1
+            _log_info(f"🖼️  {prefix}: exported {out_png.suffix[1:].upper()} → {out_png.name}")
 
-    seen_xrefs: set[int] = set()
+    def _submit_io(job, fn, *args):
+        io_jobs[io_pool.submit(fn, *args)] = job
+        if len(io_jobs) >= IO_MAX_PENDING:
+            finished, _ = wait(io_jobs, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                _collect_io(fut)
 
+    load_page = doc.load_page  # skips Document.__getitem__'s index dispatch
     for idx_i, idx in enumerate(page_indices, start=1):
         if stop_event is not None and stop_event.is_set():
-            log_cb(f"⏹️ Extraction cancelled: {pdf_path}")
+            _log_warn(f"⏹️ Extraction cancelled: {pdf_path}")
             break
         try:
-            page = doc[idx]
+            page = load_page(idx)
         except Exception as e:
             em = f"Failed to read page {idx+1}: {e}"
-            log_cb(f"⚠️  {em}")
+            _log_warn(f"⚠️  {em}")
             errors.append({"page": idx+1, "error": em})
             progress_cb_pages(idx_i, total_pages)
             continue
@@ -205,77 +491,152 @@ def extract_single_pdf(
         except Exception as e:
             images = []
             em = f"{page_prefix}: failed to list images: {e}"
-            log_cb(f"⚠️  {em}")
+            _log_warn(f"⚠️  {em}")
             errors.append({"page": idx+1, "error": em})
 
+        pending_writes: list[tuple] = []
         for img_pos, img in enumerate(images, start=1):
             try:
                 xref = img[0]
-                if xref in seen_xrefs:
+                if seen_xrefs[xref >> 3] & (1 << (xref & 7)):
                     continue
-                seen_xrefs.add(xref)
+                seen_xrefs[xref >> 3] |= 1 << (xref & 7)
                 base = doc.extract_image(xref)
                 data = base["image"]
                 ext = base.get("ext", "bin")
                 filename = safe_name(f"{page_prefix}-img-{img_pos}.{ext}")
                 out_path = output_folder / filename
-                if not overwrite and out_path.exists():
+                if not overwrite and filename in existing:
                     stem = out_path.stem
                     suf = 2
-                    while (output_folder / f"{stem}-{suf}.{ext}").exists():
+                    while f"{stem}-{suf}.{ext}" in existing:
                         suf += 1
                     out_path = output_folder / f"{stem}-{suf}.{ext}"
-                with open(out_path, "wb") as f:
-                    f.write(data)
+                existing.add(out_path.name)
+                pending_writes.append((out_path, data, idx+1, page_prefix, img_pos))
                 count_here += 1
                 images_total += 1
+                if len(pending_writes) >= IO_WRITE_BATCH:
+                    _submit_io(None, _write_image_batch, pending_writes)
+                    pending_writes = []
             except Exception as e:
                 em = f"{page_prefix}: failed to save image {img_pos}: {e}"
-                log_cb(f"⚠️  {em}")
+                _log_warn(f"⚠️  {em}")
                 errors.append({"page": idx+1, "error": em})
+        if pending_writes:
+            _submit_io(None, _write_image_batch, pending_writes)
 
         if count_here:
-            log_cb(f"✅ {page_prefix}: extracted {count_here} image(s)")
+            _log_info(f"✅ {page_prefix}: extracted {count_here} image(s)")
         else:
-            log_cb(f"ℹ️  {page_prefix}: no embedded images")
+            _log_info(f"ℹ️  {page_prefix}: no embedded images")
 
         # Optional: render page PNG
         if export_pages:
             try:
-                pix = page.get_pixmap(dpi=dpi)
-                out_png = output_folder / f"{page_prefix}.png"
-                if not overwrite and out_png.exists():
+                scan = _page_scan_image(doc, page) if fast_png else None
+                ext = scan.get("ext", "bin") if scan else "png"
+                out_png = output_folder / f"{page_prefix}.{ext}"
+                if not overwrite and out_png.name in existing:
                     n = 1
-                    while (output_folder / f"{page_prefix}-{n}.png").exists():
+                    while f"{page_prefix}-{n}.{ext}" in existing:
                         n += 1
-                    out_png = output_folder / f"{page_prefix}-{n}.png"
-                pix.save(out_png)
-                png_total += 1
-                log_cb(f"🖼️  {page_prefix}: exported PNG → {out_png.name}")
+                    out_png = output_folder / f"{page_prefix}-{n}.{ext}"
+                existing.add(out_png.name)
+                if scan:
+                    _submit_io((idx+1, page_prefix), _write_page_file, scan["image"], out_png)
+                else:
+                    pix = page.get_pixmap(dpi=dpi)
+                    mode = _PIL_MODES.get(pix.n)
+                    if PIL_AVAILABLE and mode:
+                        level = FAST_PNG_COMPRESS_LEVEL if fast_png else PNG_COMPRESS_LEVEL
+                        job_args = (_save_pix_png, pix.samples, (pix.width, pix.height), mode, out_png, level,
+                                    (pix.xres, pix.yres))
+                    else:
+                        job_args = (_write_page_file, pix.tobytes("png"), out_png)
+                    # The pool works on a copy; free the page buffer now rather than
+                    # when the next render replaces it (one full-page buffer alive, not two).
+                    del pix
+                    _submit_io((idx+1, page_prefix), *job_args)
             except Exception as e:
                 em = f"{page_prefix}: failed to render PNG: {e}"
-                log_cb(f"⚠️  {em}")
+                _log_warn(f"⚠️  {em}")
                 errors.append({"page": idx+1, "error": em})
         # end page loop
         pages_done.append(idx+1)
         progress_cb_pages(idx_i, total_pages)
-
-    try:
-        doc.close()
-    except Exception:
-        pass
+        if export_pages:
+            # Rendering fills MuPDF's resource store; release it page by page
+            # so long batch runs don't keep growing RSS.
+            page = None
+            fitz.TOOLS.store_shrink(100)
+        if time.monotonic() - last_flush >= LOG_FLUSH_INTERVAL:
+            _flush_log()
+
+    for fut in as_completed(list(io_jobs)):
+        _collect_io(fut)
+    io_pool.shutdown()
+    _flush_log()
+
+    if not cached:
+        try:
+            doc.close()
+        except Exception:
+            pass
 
     # Add to report
     if isinstance(file_report, ExtractionReport):
         file_report.add_file_result(
             input_pdf=str(pdf_path),
-            total_pages=len(doc),
+            total_pages=page_count,
             pages_processed=pages_done,
             images_extracted=images_total,
             page_pngs=png_total,
             errors=errors
         )
 
+# Shared with batch pool workers through the pool initializer
+_batch_stop = None
+_batch_pages_done = None
+_batch_pages_total = None
+
+def _init_batch_worker(stop_event, pages_done, pages_total):
+    global _batch_stop, _batch_pages_done, _batch_pages_total
+    _batch_stop = stop_event
+    _batch_pages_done = pages_done
+    _batch_pages_total = pages_total
+
+def _count_batch_pages(cur: int, tot: int):
+    # Progress is summed over all files into shared counters that the
+    # parent polls, rather than one queue message per page.
+    counter, step = (_batch_pages_total, tot) if cur == 0 else (_batch_pages_done, 1)
+    with counter.get_lock():
+        counter.value += step
+
+def _extract_single_pdf_task(pdf_path: Path, output_folder: Path, options: dict,
+                             log_queue, index: int, total: int):
+    """Process-pool entry point: extract one PDF and return its report fragment."""
+    log_queue.put(f"—— Processing [{index}/{total}]: {pdf_path.name} ——")
+    fragment = ExtractionReport(batch_mode=True)
+    extract_single_pdf(
+        pdf_path=pdf_path,
+        output_folder=output_folder,
+        log_cb=log_queue.put,
+        progress_cb_pages=_count_batch_pages,
+        stop_event=_batch_stop,
+        file_report=fragment,
+        **options,
+    )
+    return fragment.files, fragment.global_errors
+
+def _drain_to_log(log_queue, log_cb):
+    while True:
+        try:
+            msg = log_queue.get_nowait()
+        except queue.Empty:
+            return
+        log_cb(msg)
+
 def extract_batch_folder(
     *,
     input_folder: Path,
@@ -286,11 +647,18 @@ def extract_batch_folder(
     overwrite: bool,
     log_cb,
     progress_cb_files,  # (cur_file_idx, total_files)
-    progress_cb_pages,  # (cur_page, total_pages) for each file
+    progress_cb_pages,  # (pages_done, pages_total) summed over the files started so far
     report: ExtractionReport,
     stop_event: threading.Event | None = None,
+    fast_png: bool = False,
 ):
-    pdfs = sorted([p for p in input_folder.glob("*.pdf") if p.is_file()])
+    """Extract every PDF in input_folder, one process-pool task per file."""
+    # scandir's cached dirent type avoids a stat() per entry on most filesystems
+    with os.scandir(input_folder) as it:
+        pdfs = sorted(
+            (Path(e.path) for e in it if e.name.lower().endswith(".pdf") and e.is_file()),
+            key=lambda p: p.name,
+        )
     if not pdfs:
         log_cb("ℹ️  No PDF files found in the input folder.")
         return
@@ -299,29 +667,74 @@ def extract_batch_folder(
     progress_cb_files(0, total)
     log_cb(f"Batch mode: found {total} PDF(s) in {input_folder}")
 
-    for i, pdf in enumerate(pdfs, start=1):
-        if stop_event is not None and stop_event.is_set():
-            log_cb("⏹️ Batch extraction cancelled")
-            break
-        # Create per-file subfolder under output for neatness:
-        sub_out = output_folder / pdf.stem
-        log_cb(f"—— Processing [{i}/{total}]: {pdf.name} ——")
-        extract_single_pdf(
-            pdf_path=pdf,
-            output_folder=sub_out,
-            export_pages=export_pages,
-            dpi=dpi,
-            pages=pages,
-            overwrite=overwrite,
-            log_cb=log_cb,
-            progress_cb_pages=progress_cb_pages,
-            stop_event=stop_event,
-            file_report=report
-        )
-        progress_cb_files(i, total)
+    options = {"export_pages": export_pages, "dpi": dpi, "pages": pages, "overwrite": overwrite,
+               "fast_png": fast_png}
+    # Create per-file subfolder under output for neatness:
+    tasks = [(pdf, output_folder / pdf.stem, options) for pdf in pdfs]
+    # Spawn rather than fork: this runs on a worker thread of the Tk process.
+    ctx = multiprocessing.get_context("spawn")
+    done = 0
+    worker_stop = ctx.Event()
+    pages_done = ctx.Value("I", 0)
+    pages_total = ctx.Value("I", 0)
+    last_pages = (0, 0)
+    with ctx.Manager() as manager:
+        log_queue = manager.Queue()
+        workers = min(total, os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_batch_worker,
+                                 initargs=(worker_stop, pages_done, pages_total)) as pool:
+            # One PDF per task: sizes vary too much for larger chunks to balance.
+            futures = {
+                pool.submit(_extract_single_pdf_task, pdf, sub_out, opts, log_queue, i, total): (i, pdf)
+                for i, (pdf, sub_out, opts) in enumerate(tasks, start=1)
+            }
+            # Report fragments by input index: files finish in any order, but
+            # the report lists them in sorted input order.
+            fragments: dict[int, tuple[list, list]] = {}
+            pending = set(futures)
+            while pending:
+                if stop_event is not None and stop_event.is_set() and not worker_stop.is_set():
+                    log_cb("⏹️ Batch extraction cancelled")
+                    worker_stop.set()
+                    for fut in pending:
+                        fut.cancel()
+                finished, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                _drain_to_log(log_queue, log_cb)
+                cur_pages = (pages_done.value, pages_total.value)
+                if cur_pages != last_pages:
+                    last_pages = cur_pages
+                    progress_cb_pages(*cur_pages)
+                for fut in finished:
+                    if fut.cancelled():
+                        continue
+                    i, pdf = futures[fut]
+                    try:
+                        fragments[i] = fut.result()
+                    except Exception as e:
+                        msg = f"❌ Failed to process PDF: {pdf} — {e}"
+                        log_cb(msg)
+                        fragments[i] = ([], [msg])
+                    done += 1
+                    progress_cb_files(done, total)
+        for i in sorted(fragments):
+            files, global_errors = fragments[i]
+            for f in files:
+                report.add_file_result(
+                    input_pdf=f["input"],
+                    total_pages=f["total_pages"],
+                    pages_processed=f["pages_processed"],
+                    images_extracted=f["images_extracted"],
+                    page_pngs=f["page_pngs"],
+                    errors=f["errors"],
+                )
+            for msg in global_errors:
+                report.add_global_error(msg)
+        _drain_to_log(log_queue, log_cb)
 
 # ---------------- GUI ----------------
 
+LOG_MAX_LINES = 5000  # older lines are dropped from the log widget
+
 class PDFExtractorGUI(tk.Frame):
     def __init__(self, master: tk.Tk):
         super().__init__(master)
@@ -360,6 +773,7 @@ class PDFExtractorGUI(tk.Frame):
         self.dpi = tk.IntVar(value=cfg.get("dpi", 200))
         self.export_pages = tk.BooleanVar(value=False)
         self.overwrite = tk.BooleanVar(value=False)
+        self.fast_png = tk.BooleanVar(value=False)
         self.pages = tk.StringVar()
         self.batch_mode = tk.BooleanVar(value=False)
 
@@ -467,6 +881,7 @@ class PDFExtractorGUI(tk.Frame):
         ttk.Label(opts, text="DPI:").grid(row=0, column=1, sticky="e")
         ttk.Entry(opts, textvariable=self.dpi, width=7).grid(row=0, column=2, sticky="w", padx=(6, 18))
         ttk.Checkbutton(opts, text="Overwrite existing files", variable=self.overwrite).grid(row=0, column=3, sticky="w", padx=(0, 18))
+        ttk.Checkbutton(opts, text="Fast page PNGs", variable=self.fast_png).grid(row=0, column=4, sticky="w", padx=(0, 18))
         ttk.Label(opts, text="Pages (e.g. 1,3-5):").grid(row=1, column=0, sticky="w", pady=(4, 6))
         ttk.Entry(opts, textvariable=self.pages, width=28).grid(row=1, column=1, columnspan=3, sticky="w", padx=(6, 0))
 
@@ -621,6 +1036,7 @@ class PDFExtractorGUI(tk.Frame):
         pages = self.pages.get().strip()
         export_pages = self.export_pages.get()
         overwrite = self.overwrite.get()
+        fast_png = self.fast_png.get()
 
         # Mode-specific validation
         if self.batch_mode.get():
@@ -628,13 +1044,13 @@ class PDFExtractorGUI(tk.Frame):
             if not in_folder.exists() or not in_folder.is_dir():
                 messagebox.showerror("Invalid Input Folder", "Please select a valid input folder.")
                 return
-            worker_args = ("batch", in_folder, outdir, export_pages, dpi_val, pages, overwrite)
+            worker_args = ("batch", in_folder, outdir, export_pages, dpi_val, pages, overwrite, fast_png)
         else:
             pdf = Path(self.pdf_path.get().strip())
             if not pdf.exists() or pdf.suffix.lower() != ".pdf":
                 messagebox.showerror("Invalid PDF", "Please select a valid PDF file.")
                 return
-            worker_args = ("single", pdf, outdir, export_pages, dpi_val, pages, overwrite)
+            worker_args = ("single", pdf, outdir, export_pages, dpi_val, pages, overwrite, fast_png)
 
         self._save_last_config()
         self._set_running_state(True)
@@ -660,18 +1076,28 @@ class PDFExtractorGUI(tk.Frame):
                 error_count += 1
             self.log_queue.put(msg)
 
-        # pages and files progress callbacks
-        def progress_pages(cur: int, tot: int):
-            self.log_queue.put(("__PAGES__", cur, tot))
+        # pages and files progress callbacks; 1% resolution is all the bars show.
+        # Throttle on percent change, not on cur % step: batch mode reports
+        # sampled sums that jump by arbitrary amounts.
+        def throttled_progress(tag: str):
+            last = None
+
+            def progress(cur: int, tot: int):
+                nonlocal last
+                key = (cur * 100 // tot if tot else 0, tot)
+                if cur == tot or key != last:
+                    last = key
+                    self.log_queue.put((tag, cur, tot))
+            return progress
 
-        def progress_files(cur: int, tot: int):
-            self.log_queue.put(("__FILES__", cur, tot))
+        progress_pages = throttled_progress("__PAGES__")
+        progress_files = throttled_progress("__FILES__")
 
-        report = ExtractionReport(batch_mode=(mode == "batch"))
+        report = ExtractionReport(batch_mode=(mode == "batch"), stream_to=Path(self.out_path.get().strip()))
 
         try:
             if mode == "batch":
-                in_folder, outdir, export_pages, dpi_val, pages, overwrite = args
+                in_folder, outdir, export_pages, dpi_val, pages, overwrite, fast_png = args
                 extract_batch_folder(
                     input_folder=in_folder,
                     output_folder=outdir,
@@ -684,9 +1110,10 @@ class PDFExtractorGUI(tk.Frame):
                     progress_cb_pages=progress_pages,
                     report=report,
                     stop_event=stop_event,
+                    fast_png=fast_png,
                 )
             else:
-                pdf, outdir, export_pages, dpi_val, pages, overwrite = args
+                pdf, outdir, export_pages, dpi_val, pages, overwrite, fast_png = args
                 extract_single_pdf(
                     pdf_path=pdf,
                     output_folder=outdir,
@@ -698,6 +1125,8 @@ class PDFExtractorGUI(tk.Frame):
                     progress_cb_pages=progress_pages,
                     stop_event=stop_event,
                     file_report=report,
+                    fast_png=fast_png,
+                    cache_doc=True,
                 )
         finally:
             # Write JSON report
@@ -707,29 +1136,39 @@ class PDFExtractorGUI(tk.Frame):
             self.log_queue.put(("__DONE__", error_count, report))
 
     def _drain_log_queue(self):
+        text_lines: list[str] = []
+        # Only the latest progress per tick matters
+        latest_pages = latest_files = None
         try:
             while True:
                 item = self.log_queue.get_nowait()
                 if isinstance(item, tuple) and item:
                     tag = item[0]
                     if tag == "__PAGES__":
-                        _, cur, tot = item
-                        self._update_progress_pages(cur, tot)
+                        latest_pages = item[1:]
                     elif tag == "__FILES__":
-                        _, cur, tot = item
-                        self._update_progress_files(cur, tot)
+                        latest_files = item[1:]
                     elif tag == "__DONE__":
                         _, err_count, report = item
+                        # Show everything logged so far before the dialog
+                        self._log_lines(text_lines)
+                        text_lines = []
+                        latest_pages = latest_files = None
                         self._set_running_state(False)
                         self._finish_dialog(err_count, report)
                     else:
                         # Unknown tuple
                         pass
                 else:
-                    self._log(str(item))
+                    text_lines.append(str(item))
         except queue.Empty:
             pass
         finally:
+            self._log_lines(text_lines)
+            if latest_pages is not None:
+                self._update_progress_pages(*latest_pages)
+            if latest_files is not None:
+                self._update_progress_files(*latest_files)
             self.after(50, self._drain_log_queue)
 
     # ---------- UI Utilities ----------
@@ -745,8 +1184,17 @@ class PDFExtractorGUI(tk.Frame):
         self.progress_pages_label.configure(text=f"Pages: {cur}/{tot}" if tot else "Pages: 0/0")
 
     def _log(self, text: str):
+        self._log_lines([text])
+
+    def _log_lines(self, lines: list[str]):
+        """Append lines to the log widget in one insert, trimming it to LOG_MAX_LINES."""
+        if not lines:
+            return
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", text + "\n")
+        self.log_text.insert("end", "\n".join(lines) + "\n")
+        excess = int(self.log_text.index("end-1c").split(".")[0]) - 1 - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
 
@@ -778,7 +1226,7 @@ class PDFExtractorGUI(tk.Frame):
             pass
 
     def _finish_dialog(self, err_count: int, report: ExtractionReport):
-        if err_count > 0 or report.to_dict()["summary"]["files_with_errors"] > 0:
+        if err_count > 0 or report.summary()["files_with_errors"] > 0:
             messagebox.showwarning(
                 "Completed with Warnings",
                 f"Extraction finished with {err_count} warning(s).\n"
@@ -793,6 +1241,8 @@ class PDFExtractorGUI(tk.Frame):
         self.progress_pages_label.configure(text="Pages: 0/0")
 
 if __name__ == "__main__":
+    # Needed for the batch process pool in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     # Create the appropriate root window: prefer TkinterDnD root when available
     if TKDND_AVAILABLE:
         # Try the module-level constructor first (tkinterdnd2.Tk()), then class-based
@@ -2,7 +2,7 @@
 """
 PDF Image Extractor
 
-Extract embedded images from a PDF (optionally render each page to PNG).
+Extract embedded images from a PDF (optionally render each page to PNG/JPEG/WebP).
 
 Requirements:
     pip install PyMuPDF Pillow
@@ -13,14 +13,36 @@ __email__ = "alnajim@protonmail.com"
 __version__ = "1.0.0"
 
 import argparse
+import io
+import mmap
+import os
+import queue
 import re
+import shutil
+import string
+import struct
+import sys
+import tarfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from itertools import compress, repeat
 from pathlib import Path
-from typing import Optional
+from typing import Callable, NamedTuple, Optional, Union
 
 SAFE_CHARS = re.compile(r'[^A-Za-z0-9._@-]')
+_SAFE_ALLOWED = set(string.ascii_letters + string.digits + "._@-")
+_SAFE_TRANS = {cp: "-" for cp in range(128) if chr(cp) not in _SAFE_ALLOWED}
 
-def safe_name(s: str) -> str:
-    return SAFE_CHARS.sub("-", s)
+def safe_name(s: str, compat: bool = False) -> str:
+    if compat:
+        return SAFE_CHARS.sub("-", s)
+    s = s.translate(_SAFE_TRANS)
+    # The table only covers ASCII; the regex catches anything else
+    return s if s.isascii() else SAFE_CHARS.sub("-", s)
 
 
 def parse_page_range(pages: str | None, max_page: int) -> list[int]:
@@ -29,20 +51,527 @@ def parse_page_range(pages: str | None, max_page: int) -> list[int]:
     """
     if not pages:
         return list(range(max_page))
-    wanted = set()
+    selected = bytearray(max_page)  # one flag per zero-based page: no set, no sort
     for part in pages.split(","):
         part = part.strip()
         if "-" in part:
             a, b = part.split("-", 1)
             start = max(1, int(a))
             end = min(max_page, int(b))
-            wanted.update(range(start, end + 1))
+            if start <= end:
+                selected[start - 1:end] = b"\x01" * (end - start + 1)
         else:
             p = int(part)
             if 1 <= p <= max_page:
-                wanted.add(p)
-    # to zero-based
-    return sorted([p - 1 for p in wanted])
+                selected[p - 1] = 1
+    return list(compress(range(max_page), selected))
+
+
+def _write_bytes(path, data: bytes) -> None:
+    # Each output is one in-memory payload: write it with unbuffered write()s
+    # instead of copying it through a BufferedWriter first. A raw write() may
+    # be partial; memoryview slices hand the rest over without copying.
+    with open(path, "wb", buffering=0) as f:
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += f.write(view[written:])
+
+
+def _replace_bytes(path, data: bytes) -> None:
+    """
+    _BatchWriter sink for --overwrite: remove an existing file before writing.
+    An earlier --dedupe-hardlink run may have left it sharing an inode with
+    other outputs, which an in-place rewrite would change as well.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    _write_bytes(path, data)
+
+
+def _add_to_tar(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    """_BatchWriter sink for --bundle: append one file to the open archive."""
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info, io.BytesIO(data))
+
+
+def _link_in_tar(tar: tarfile.TarFile, src: str, dst: str) -> None:
+    """_BatchWriter link sink for --bundle: a hard-link member pointing at src."""
+    info = tarfile.TarInfo(dst)
+    info.type = tarfile.LNKTYPE
+    info.linkname = src
+    info.mtime = int(time.time())
+    info.mode = 0o644
+    tar.addfile(info)
+
+
+def _link_file(src: str, dst: str) -> None:
+    """Hard-link dst to src; copy instead where the filesystem can't link (FAT, some shares)."""
+    if os.path.lexists(dst):  # only with --overwrite; names are probed otherwise
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+class _Link(NamedTuple):
+    src: str
+
+
+WRITE_BATCH = 64  # files handed to the writer thread at a time
+
+
+class _BatchWriter:
+    """
+    Write (path, data) pairs on a background thread, handed over in batches,
+    so per-file open/write/close latency stays off the decode loop. `data`
+    may also be a callable returning the bytes, run on the writer thread
+    (it must not touch PyMuPDF objects). link() queues a hard link in the
+    same FIFO, so it always runs after the write of its source. A failed
+    write is re-raised on the next flush() or close().
+    """
+
+    def __init__(self, batch_size: int = WRITE_BATCH, max_batches: int = 4, sink=_write_bytes, link=_link_file):
+        self._batch_size = batch_size
+        self._sink = sink  # called as sink(path, data) on the writer thread
+        self._link = link  # called as link(src, dst) on the writer thread
+        self._pending: list[tuple[object, Union[bytes, Callable[[], bytes], _Link]]] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_batches)  # bounds memory
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, path, data: Union[bytes, Callable[[], bytes]]) -> None:
+        self._pending.append((path, data))
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def link(self, src: str, dst: str) -> None:
+        self.write(dst, _Link(src))
+
+    def flush(self) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._pending:
+            self._queue.put(self._pending)
+            self._pending = []
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue  # keep draining so the producer never blocks
+            for path, data in batch:
+                try:
+                    if isinstance(data, _Link):
+                        self._link(data.src, path)
+                    else:
+                        self._sink(path, data() if callable(data) else data)
+                except BaseException as e:
+                    self._error = e
+                    break
+            # don't keep the batch's payloads alive while waiting for the next one
+            batch.clear()
+            data = None
+
+
+PAGES_PER_TASK = 8  # pages per worker task; amortizes fitz.open() in each worker
+MAX_PAGE_PIXELS = 50_000_000  # warn above this many pixels per rendered page
+# Single-filter streams that already are image files: copied as-is, not decoded,
+# unless a /Decode array changes their colours (extract_image applies it)
+_RAW_IMAGE_FILTERS = {"/DCTDecode": "jpeg", "/JPXDecode": "jpx"}
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_COLOR_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}  # samples per pixel -> PNG color type
+
+
+class _RenderOptions(NamedTuple):
+    export_pages: bool
+    dpi: int
+    png_encoder: str = "pymupdf"  # or "libdeflate"
+    png_level: int = 3  # libdeflate and tiled rendering
+    tile: int = 0  # >0: render in bands of this many pixel rows
+    defer_encode: bool = False  # libdeflate/webp: leave encoding to the page writer thread
+    page_format: str = "png"  # "png", "jpg", "webp" or "auto"
+    quality: int = 85  # jpg and webp
+    pillow: bool = False  # Pillow importable: encode jpg with it (libjpeg-turbo, far faster)
+    mmap: bool = False  # open the PDF through a read-only memory map (see _open_pdf)
+
+
+def _png_chunk(tag: bytes, data) -> bytes:
+    crc = zlib.crc32(data, zlib.crc32(tag))
+    return struct.pack(">I", len(data)) + tag + bytes(data) + struct.pack(">I", crc)
+
+
+def _png_header(width: int, height: int, n: int) -> bytes:
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, _PNG_COLOR_TYPES[n], 0, 0, 0)
+    return PNG_SIGNATURE + _png_chunk(b"IHDR", ihdr)
+
+
+def _png_phys(dpi: int) -> bytes:
+    """pHYs chunk recording `dpi`, as MuPDF writes it (pixels per metre)."""
+    ppm = round(dpi / 0.0254)
+    return _png_chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+
+def _png_scanlines(samples, offset: int, stride: int, row_len: int, rows: int) -> bytearray:
+    """PNG scanline data for `rows` rows: filter byte 0, then the raw row bytes."""
+    src = memoryview(samples)
+    raw = bytearray((row_len + 1) * rows)
+    for y in range(rows):
+        out = y * (row_len + 1) + 1
+        start = offset + y * stride
+        raw[out:out + row_len] = src[start:start + row_len]
+    return raw
+
+
+def _encode_png_libdeflate(samples, width: int, height: int, stride: int, n: int, level: int,
+                           dpi: int) -> bytes:
+    """
+    Encode 8-bit pixmap samples as PNG, compressing with libdeflate
+    (`pip install deflate`). Rows use filter type 0, so no per-pixel Python work.
+    """
+    import deflate
+
+    raw = _png_scanlines(samples, 0, stride, width * n, height)
+    return (_png_header(width, height, n) + _png_phys(dpi)
+            + _png_chunk(b"IDAT", deflate.zlib_compress(raw, level)) + _png_chunk(b"IEND", b""))
+
+
+_PIL_MODES = {1: "L", 3: "RGB", 4: "RGBA"}  # samples per pixel -> Pillow mode
+
+
+def _encode_pillow(samples, width: int, height: int, stride: int, n: int, fmt: str, quality: int,
+                   dpi: int) -> bytes:
+    """
+    Encode 8-bit pixmap samples as JPEG or WebP with Pillow. JPEGs record
+    `dpi` in their JFIF header, as pix.tobytes("jpeg") does; WebP has no field for it.
+    """
+    from PIL import Image
+
+    mode = _PIL_MODES[n]
+    im = Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1)
+    buf = io.BytesIO()
+    if fmt == "webp":
+        im.save(buf, "WEBP", quality=quality, method=4)
+    else:
+        im.save(buf, "JPEG", quality=quality, dpi=(dpi, dpi))
+    return buf.getvalue()
+
+
+def _render_page_tiled(page, dpi: int, tile: int, level: int) -> bytes:
+    """
+    Render a page to PNG in bands of at most `tile` pixel rows, streaming each
+    band through one zlib compressor. Only a band is ever held uncompressed,
+    instead of the whole page (~35 MB for A4 at 300 DPI). Output matches
+    page.get_pixmap(dpi=dpi) in size and content; MuPDF's clipped rendering can
+    shift anti-aliasing on stroked edges by a few levels.
+    """
+    import fitz  # PyMuPDF
+
+    mat = fitz.Matrix(dpi / 72, dpi / 72)
+    inv = ~mat
+    full = (page.rect * mat).irect
+    width, n = full.width, 3
+    row_len = width * n
+    comp = zlib.compressobj(min(level, 9))
+    parts = [_png_header(width, full.height, n), _png_phys(dpi)]
+    pending = bytearray()
+    dl = page.get_displaylist()  # interpret the page once for all bands
+    for y0 in range(full.y0, full.y1, tile):
+        y1 = min(y0 + tile, full.y1)
+        # Render one pixel beyond the band on every side, then crop exactly,
+        # so rounding of the clip rectangle can never drop or repeat a row.
+        clip = fitz.Rect(full.x0 - 1, y0 - 1, full.x1 + 1, y1 + 1) * inv
+        pix = dl.get_pixmap(matrix=mat, clip=clip)
+        offset = (y0 - pix.y) * pix.stride + (full.x0 - pix.x) * pix.n
+        pending += comp.compress(_png_scanlines(pix.samples_mv, offset, pix.stride, row_len, y1 - y0))
+        pix = None
+        if len(pending) >= 1 << 16:
+            parts.append(_png_chunk(b"IDAT", pending))
+            pending = bytearray()
+    pending += comp.flush()
+    parts.append(_png_chunk(b"IDAT", pending))
+    parts.append(_png_chunk(b"IEND", b""))
+    return b"".join(parts)
+
+
+class _PageResult(NamedTuple):
+    idx: int
+    image_count: int  # images referenced by the page, duplicates included
+    # (img_pos, xref, data, ext); data is None (ext "") for an image already
+    # extracted for an earlier page
+    images: list[tuple[int, int, Optional[bytes], str]]
+    page_data: Union[bytes, Callable[[], bytes], None]  # callable: encode on the writer thread
+    notes: tuple[str, ...] = ()  # warnings to print with the page's log lines
+    page_ext: str = "png"
+
+
+@contextmanager
+def _open_pdf(fitz, pdf_path, use_mmap: bool = False):
+    """
+    Open pdf_path as a fitz.Document, closed on exit. With use_mmap, MuPDF
+    reads straight from a read-only mapping of the file (PyMuPDF passes the
+    buffer through without copying) instead of through its own read() calls.
+    """
+    mm = None
+    if use_mmap:
+        with open(pdf_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size:  # empty files can't be mapped; MuPDF reports them
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm is None:
+        doc = fitz.open(pdf_path)
+        try:
+            yield doc
+        finally:
+            doc.close()
+        return
+    if hasattr(mm, "madvise"):
+        # xref lookups jump around the file; fault-time readahead would be wasted
+        mm.madvise(mmap.MADV_RANDOM)
+    view = memoryview(mm)
+    try:
+        doc = fitz.open(stream=view, filetype="pdf")
+        try:
+            yield doc
+        finally:
+            doc.close()
+    finally:
+        # MuPDF holds a raw pointer into the map: release only after close()
+        view.release()
+        mm.close()
+
+
+def _quiet_mupdf(fitz) -> None:
+    """
+    Stop MuPDF printing errors/warnings to stderr as they happen (slow on
+    damaged PDFs that emit thousands). They are still recorded, and
+    _mupdf_notes() reports them with the page that raised them.
+    """
+    fitz.TOOLS.mupdf_display_errors(False)
+    fitz.TOOLS.mupdf_display_warnings(False)
+
+
+def _mupdf_notes(fitz) -> tuple[str, ...]:
+    """Messages MuPDF recorded since the last call, repeats collapsed."""
+    counts: dict[str, int] = {}
+    for line in fitz.TOOLS.mupdf_warnings().splitlines():  # also resets the log
+        counts[line] = counts.get(line, 0) + 1
+    return tuple(f"MuPDF: {msg}" + (f" (x{n})" if n > 1 else "") for msg, n in counts.items())
+
+
+def _render_notes(page, images, dpi: int) -> tuple[str, ...]:
+    """Warn about page renders that are huge, or finer than the scan behind them."""
+    notes = []
+    w, h = page.rect.width, page.rect.height
+    pixels = w * h * (dpi / 72) ** 2
+    if pixels > MAX_PAGE_PIXELS:
+        notes.append(f"render is ~{pixels / 1e6:.0f} MP at {dpi} DPI; "
+                     "try a lower --dpi or --render-tile")
+    if len(images) == 1 and w > 0 and h > 0:
+        # one image covering the page: a scan, whose resolution caps the detail.
+        # Aspect ratio first; only then pay for locating the image on the page.
+        xref, iw, ih = images[0][0], images[0][2], images[0][3]
+        page_aspect = max(w, h) / min(w, h)
+        if min(iw, ih) > 0 and abs(max(iw, ih) / min(iw, ih) - page_aspect) < 0.03 * page_aspect:
+            rects = page.get_image_rects(xref)
+            if rects and abs(rects[0] & page.rect) >= 0.9 * abs(page.rect):
+                scan_dpi = max(iw, ih) * 72 / max(w, h)
+                if dpi > 1.5 * scan_dpi:
+                    notes.append(f"scanned at ~{scan_dpi:.0f} DPI; rendering at {dpi} DPI adds no detail")
+    return tuple(notes)
+
+
+def _process_page(
+    doc, idx: int, opts: _RenderOptions, decoded: set[int], owned: Optional[frozenset[int]] = None
+) -> _PageResult:
+    """
+    Decode one page: its embedded images not yet in `decoded` (which is
+    updated) and, optionally, the rendered page image. Does no file I/O.
+    If `owned` is given, only those xrefs are extracted; another worker
+    handles the rest.
+    """
+    import fitz  # PyMuPDF
+
+    page = doc[idx]
+    images = page.get_images(full=True)
+    extracted = []
+    for img_pos, img in enumerate(images, start=1):
+        xref = img[0]
+        if xref in decoded or (owned is not None and xref not in owned):
+            extracted.append((img_pos, xref, None, ""))  # the parent may link it
+            continue
+        decoded.add(xref)
+        kind, filt = doc.xref_get_key(xref, "Filter")
+        if (kind == "name" and filt in _RAW_IMAGE_FILTERS
+                and doc.xref_get_key(xref, "Decode")[0] == "null"):
+            extracted.append((img_pos, xref, doc.xref_stream_raw(xref), _RAW_IMAGE_FILTERS[filt]))
+        else:
+            base = doc.extract_image(xref)
+            extracted.append((img_pos, xref, base["image"], base.get("ext", "bin")))
+    page_data = None
+    page_ext = opts.page_format
+    if page_ext == "auto":
+        # pages with pictures encode far faster (and smaller) as JPEG than as PNG;
+        # renders are opaque, so nothing is lost to a missing alpha channel
+        page_ext = "jpg" if images else "png"
+    if opts.export_pages and page_ext == "png" and opts.tile > 0:
+        page_data = _render_page_tiled(page, opts.dpi, opts.tile, opts.png_level)
+    elif opts.export_pages:
+        # A fresh pixmap per page: get_pixmap can't render into an existing one, and
+        # drawing into a reused Pixmap through Page.run is far slower.
+        pix = page.get_pixmap(dpi=opts.dpi)  # renders vector content too
+        if page_ext == "webp" or (page_ext == "jpg" and opts.pillow and pix.n in (1, 3)):
+            if opts.defer_encode:
+                page_data = partial(_encode_pillow, pix.samples, pix.width, pix.height,
+                                    pix.stride, pix.n, page_ext, opts.quality, opts.dpi)
+            else:
+                page_data = _encode_pillow(pix.samples_mv, pix.width, pix.height, pix.stride, pix.n,
+                                           page_ext, opts.quality, opts.dpi)
+        elif page_ext == "jpg":
+            page_data = pix.tobytes("jpeg", jpg_quality=opts.quality)
+        elif opts.png_encoder == "libdeflate" and pix.n in _PNG_COLOR_TYPES:
+            if opts.defer_encode:
+                # pix.samples is a copy, so the encode needs no MuPDF object
+                page_data = partial(_encode_png_libdeflate, pix.samples, pix.width, pix.height,
+                                    pix.stride, pix.n, opts.png_level, opts.dpi)
+            else:
+                page_data = _encode_png_libdeflate(pix.samples_mv, pix.width, pix.height, pix.stride, pix.n,
+                                                   opts.png_level, opts.dpi)
+        else:
+            page_data = pix.tobytes("png")
+        pix = None  # release the full-page buffer before anything else is decoded
+    notes = _mupdf_notes(fitz)
+    if opts.export_pages:
+        notes += _render_notes(page, images, opts.dpi)
+    return _PageResult(idx, len(images), extracted, page_data, notes, page_ext)
+
+
+def _process_pages_chunk(
+    pdf_path: str, indices: list[int], opts: _RenderOptions, owned: frozenset[int]
+) -> list[_PageResult]:
+    """Worker entry point: PyMuPDF documents can't cross processes, so open our own."""
+    import fitz  # PyMuPDF
+
+    _quiet_mupdf(fitz)
+    with _open_pdf(fitz, pdf_path, opts.mmap) as doc:
+        _mupdf_notes(fitz)  # open-time messages were already reported by the parent
+        decoded: set[int] = set()
+        return [_process_page(doc, idx, opts, decoded, owned) for idx in indices]
+
+
+class _LogBuffer:
+    """Collect log lines and write them to stdout in one call per flush(), not one per line."""
+
+    def __init__(self):
+        self._lines: list[str] = []
+
+    def append(self, msg: str) -> None:
+        self._lines.append(msg)
+
+    def flush(self) -> None:
+        if self._lines:
+            sys.stdout.write("\n".join(self._lines) + "\n")
+            self._lines.clear()
+
+
+class _SaveContext(NamedTuple):
+    out_base: str  # output folder path ending in os.sep; paths are plain str concatenation
+    overwrite: bool
+    writer: _BatchWriter  # embedded images
+    page_writer: _BatchWriter  # page renders
+    seen_xrefs: dict[int, str]  # xref -> path it was saved under (arcname with bundle)
+    # Without --overwrite: names in the output folder, plus those queued this
+    # run, so collision checks are set lookups instead of a stat() per name
+    taken: set[str]
+    log: _LogBuffer  # page log lines, flushed once per page
+    compat_safenames: bool = False
+    bundle: bool = False  # images go into a fresh tar: names are bare, never checked on disk
+    dedupe_hardlink: bool = False  # repeated images become hard links to the first copy
+
+
+def _image_path(ctx: _SaveContext, filename: str, ext: str) -> str:
+    """Output path for an embedded image, suffixed if the name is already taken."""
+    if ctx.bundle:
+        return filename
+    if not ctx.overwrite:
+        if filename in ctx.taken:
+            # if name collides (rare), add a suffix
+            stem = os.path.splitext(filename)[0]
+            suf = 2
+            while f"{stem}-{suf}.{ext}" in ctx.taken:
+                suf += 1
+            filename = f"{stem}-{suf}.{ext}"
+        ctx.taken.add(filename)
+    return ctx.out_base + filename
+
+
+def _save_page_result(result: _PageResult, ctx: _SaveContext) -> int:
+    """Write one page's outputs, skipping images already saved for an earlier page."""
+    page_prefix = f"page-{result.idx+1:03d}"
+
+    # --- Embedded images (original bytes) ---
+    count_here = 0
+    linked = 0
+    for img_pos, xref, data, ext in result.images:
+        if xref in ctx.seen_xrefs:
+            # image object reused on another page; skip duplicate, or link to it
+            if ctx.dedupe_hardlink:
+                src = ctx.seen_xrefs[xref]
+                ext = os.path.splitext(src)[1][1:]
+                filename = safe_name(f"{page_prefix}-img-{img_pos}.{ext}", ctx.compat_safenames)
+                ctx.writer.link(src, _image_path(ctx, filename, ext))
+                linked += 1
+            continue
+
+        filename = safe_name(f"{page_prefix}-img-{img_pos}.{ext}", ctx.compat_safenames)
+        out_path = _image_path(ctx, filename, ext)
+        ctx.seen_xrefs[xref] = out_path
+        ctx.writer.write(out_path, data)
+        count_here += 1
+
+    if result.image_count:
+        ctx.log.append(f"✅ {page_prefix}: extracted {count_here} image(s)"
+                       + (f", linked {linked} repeat(s)" if linked else ""))
+    else:
+        ctx.log.append(f"⚠️ {page_prefix}: no embedded images")
+
+    for note in result.notes:
+        ctx.log.append(f"⚠️ {page_prefix}: {note}")
+
+    # --- Optional: full page render ---
+    if result.page_data is not None:
+        ext = result.page_ext
+        page_name = f"{page_prefix}.{ext}"
+        if not ctx.overwrite:
+            if page_name in ctx.taken:
+                n = 1
+                while f"{page_prefix}-{n}.{ext}" in ctx.taken:
+                    n += 1
+                page_name = f"{page_prefix}-{n}.{ext}"
+            ctx.taken.add(page_name)
+        ctx.page_writer.write(ctx.out_base + page_name, result.page_data)
+        ctx.log.append(f"🖼️ {page_prefix}: exported {ext.upper()} → {page_name}")
+    ctx.log.flush()
+
+    return count_here
 
 
 def extract_images_from_pdf(
@@ -52,82 +581,161 @@ def extract_images_from_pdf(
     dpi: int = 200,
     pages: Optional[str] = None,
     overwrite: bool = False,
+    workers: int = 1,
+    png_encoder: str = "pymupdf",
+    png_level: int = 3,
+    render_tile: int = 0,
+    max_dpi: int = 400,
+    compat_safenames: bool = False,
+    page_format: str = "png",
+    quality: int = 85,
+    bundle: bool = False,
+    use_mmap: bool = False,
+    dedupe_hardlink: bool = False,
 ) -> None:
+    """
+    Extract embedded images (and optionally page renders) from pdf_path.
+
+    With workers > 1 (0 = one per CPU), pages are decoded and rendered in a
+    process pool; files are still written here, in page order. Page renders
+    are capped at max_dpi (0 = no cap). With bundle, embedded images are
+    packed into one uncompressed images.tar instead of one file each. With
+    use_mmap, the PDF is read through a memory map (see _open_pdf). With
+    dedupe_hardlink, each repeat of an image gets its own name, hard-linked
+    to the first saved copy (copied where links aren't supported).
+    """
     try:
         import fitz  # PyMuPDF
     except Exception as e:
         raise SystemExit(
             "PyMuPDF (fitz) not installed. Install with: pip install PyMuPDF"
         ) from e
+    try:
+        from PIL import Image  # noqa: F401
+        pillow = True
+    except Exception as e:
+        if export_pages and page_format == "webp":
+            raise SystemExit(
+                "Pillow not installed (needed for --format webp). Install with: pip install Pillow"
+            ) from e
+        pillow = False
+    if export_pages and png_encoder == "libdeflate":
+        try:
+            import deflate  # noqa: F401
+        except Exception as e:
+            raise SystemExit(
+                "libdeflate bindings not installed. Install with: pip install deflate"
+            ) from e
+    if export_pages and max_dpi and dpi > max_dpi:
+        print(f"⚠️ --dpi {dpi} exceeds --max-dpi {max_dpi}; rendering pages at {max_dpi} DPI")
+        dpi = max_dpi
+    opts = _RenderOptions(export_pages, dpi, png_encoder, png_level, render_tile,
+                          page_format=page_format, quality=quality, pillow=pillow, mmap=use_mmap)
     output_folder.mkdir(parents=True, exist_ok=True)
-    doc = fitz.open(pdf_path)
+    out_base = str(output_folder.resolve()) + os.sep
+    _quiet_mupdf(fitz)
+    total_images = 0
+    workers = workers or os.cpu_count() or 1
+    with ExitStack() as cleanup:  # closes writers, then the tar, then the PDF, even on error
+        doc = cleanup.enter_context(_open_pdf(fitz, pdf_path, use_mmap))
 
-    page_indices = parse_page_range(pages, len(doc))
-    print(f"Opened: {pdf_path}  pages={len(doc)}  processing={len(page_indices)} page(s)")
+        page_indices = parse_page_range(pages, len(doc))
+        print(f"Opened: {pdf_path}  pages={len(doc)}  processing={len(page_indices)} page(s)")
+        for note in _mupdf_notes(fitz):
+            print(f"⚠️ {note}")
 
-    total_images = 0
-    seen_xrefs: set[int] = set()  # avoid saving same image multiple times
-
-    for idx in page_indices:
-        page = doc[idx]
-        page_prefix = f"page-{idx+1:03d}"
-
-        # --- Embedded images (original bytes) ---
-        images = page.get_images(full=True)
-        if images:
-            count_here = 0
-            for img_pos, img in enumerate(images, start=1):
-                xref = img[0]
-                if xref in seen_xrefs:
-                    # image object reused on another page; skip duplicate
-                    continue
-                seen_xrefs.add(xref)
-
-                base = doc.extract_image(xref)
-                data = base["image"]
-                ext = base.get("ext", "bin")
-                filename = safe_name(f"{page_prefix}-img-{img_pos}.{ext}")
-                out_path = output_folder / filename
-
-                if not overwrite and out_path.exists():
-                    # if name collides (rare), add a suffix
-                    stem = out_path.stem
-                    suf = 2
-                    while (output_folder / f"{stem}-{suf}.{ext}").exists():
-                        suf += 1
-                    out_path = output_folder / f"{stem}-{suf}.{ext}"
-
-                with open(out_path, "wb") as f:
-                    f.write(data)
-                count_here += 1
-                total_images += 1
-
-            print(f"✅ {page_prefix}: extracted {count_here} image(s)")
-        else:
-            print(f"⚠️ {page_prefix}: no embedded images")
-
-        # --- Optional: full page PNG ---
-        if export_pages:
-            pix = page.get_pixmap(dpi=dpi)  # renders vector content too
-            out_png = output_folder / f"{page_prefix}.png"
-            if not overwrite and out_png.exists():
-                out_png = output_folder / f"{page_prefix}-1.png"
+        sink = _replace_bytes if overwrite else _write_bytes
+        taken: set[str] = set()
+        if not overwrite:
+            with os.scandir(out_base) as it:
+                taken = {e.name for e in it}
+        tar = None
+        if bundle:
+            tar_name = "images.tar"
+            if not overwrite and tar_name in taken:
                 n = 2
-                while out_png.exists():
-                    out_png = output_folder / f"{page_prefix}-{n}.png"
+                while f"images-{n}.tar" in taken:
                     n += 1
-            pix.save(out_png)
-            print(f"🖼️ {page_prefix}: exported PNG → {out_png.name}")
+                tar_name = f"images-{n}.tar"
+            tar = tarfile.open(out_base + tar_name, "w")
+            cleanup.callback(tar.close)
+        if tar:
+            writer = _BatchWriter(sink=partial(_add_to_tar, tar), link=partial(_link_in_tar, tar))
+        else:
+            writer = _BatchWriter(sink=sink)
+        cleanup.callback(writer.close)
+        # One page render at a time; at most two more queued, so pixel memory stays bounded
+        page_writer = _BatchWriter(batch_size=1, max_batches=2, sink=sink)
+        cleanup.callback(page_writer.close)
+        ctx = _SaveContext(
+            out_base, overwrite, writer, page_writer,
+            seen_xrefs={},  # avoid saving same image multiple times
+            taken=taken,
+            log=_LogBuffer(), compat_safenames=compat_safenames, bundle=bundle,
+            dedupe_hardlink=dedupe_hardlink,
+        )
+        if workers > 1 and len(page_indices) > PAGES_PER_TASK:
+            chunks = [page_indices[i:i + PAGES_PER_TASK] for i in range(0, len(page_indices), PAGES_PER_TASK)]
+            # An image is extracted only by the chunk holding its first page, which
+            # is the copy that gets saved. Listing images parses no image data.
+            listed: set[int] = set()
+            owned = []
+            for chunk in chunks:
+                mine = set()
+                for idx in chunk:
+                    for img in doc.get_page_images(idx):
+                        if img[0] not in listed:
+                            listed.add(img[0])
+                            mine.add(img[0])
+                owned.append(frozenset(mine))
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                # map() yields in submission order, so output stays in page order
+                for results in pool.map(
+                    _process_pages_chunk, repeat(str(pdf_path)), chunks, repeat(opts), owned
+                ):
+                    for result in results:
+                        total_images += _save_page_result(result, ctx)
+        else:
+            decoded: set[int] = set()
+            opts = opts._replace(defer_encode=True)  # overlap encode+write with the next render
+            for idx in page_indices:
+                result = _process_page(doc, idx, opts, decoded)
+                total_images += _save_page_result(result, ctx)
 
-    doc.close()
     print(f"\n🎉 Done. Extracted {total_images} unique image object(s).")
     print(f"Output → {output_folder.resolve()}")
+    if bundle:
+        print(f"Images → {tar_name}")
+
+
+def _jpeg_quality(value: str) -> int:
+    """argparse type for --jpeg-quality: an integer from 1 to 100."""
+    try:
+        q = int(value)
+    except ValueError:
+        q = None
+    if q is None or not 1 <= q <= 100:
+        raise argparse.ArgumentTypeError(f"must be an integer from 1 to 100, got {value!r}")
+    return q
+
+
+def _int_at_least(minimum: int) -> Callable[[str], int]:
+    """argparse type: an integer no smaller than `minimum`."""
+    def parse(value: str) -> int:
+        try:
+            n = int(value)
+        except ValueError:
+            n = None
+        if n is None or n < minimum:
+            raise argparse.ArgumentTypeError(f"must be an integer >= {minimum}, got {value!r}")
+        return n
+    return parse
 
 
 def main():
     description = (
         "Extract embedded images from a PDF in their original formats.\n"
-        "Optionally render each selected page as a PNG at a given DPI."
+        "Optionally render each selected page as a PNG, JPEG or WebP at a given DPI."
     )
     epilog = (
         "Examples:\n"
@@ -144,10 +752,33 @@ def main():
     )
     ap.add_argument("pdf", type=Path, help="Path to PDF")
     ap.add_argument("out", type=Path, help="Output folder")
-    ap.add_argument("--export-pages", action="store_true", help="Also export each page as PNG")
-    ap.add_argument("--dpi", type=int, default=200, help="DPI for page PNG render (default: 200)")
+    ap.add_argument("--export-pages", action="store_true", help="Also export each page as an image (see --format)")
+    ap.add_argument("--dpi", type=_int_at_least(1), default=200, help="DPI for page render (default: 200)")
+    ap.add_argument("--format", choices=("png", "jpg", "webp", "auto"), default="png",
+                    help="Page image format (default: png; auto = jpg for pages with images, else png)")
+    ap.add_argument("--jpeg-quality", type=_jpeg_quality, default=85, metavar="1-100",
+                    help="Quality 1-100 for --format jpg/webp (default: 85)")
+    ap.add_argument("--max-dpi", type=_int_at_least(0), default=400,
+                    help="Clamp --dpi to this value; render time grows with DPI squared (default: 400, 0 = no cap)")
+    ap.add_argument("--png-encoder", choices=("pymupdf", "libdeflate"), default="pymupdf",
+                    help="Encoder for page PNGs (default: pymupdf; libdeflate needs `pip install deflate`)")
+    ap.add_argument("--png-level", type=int, choices=range(13), default=3, metavar="0-12",
+                    help="Compression level 0-12 for --png-encoder libdeflate (default: 3)")
+    ap.add_argument("--render-tile", type=_int_at_least(0), default=0, metavar="ROWS",
+                    help="Render page PNGs in bands of ROWS pixel rows to cap memory at high DPI "
+                         "(streams through zlib at --png-level; default: 0 = whole page)")
     ap.add_argument("--pages", type=str, default=None, help="Pages to process, e.g. '1,3-5,10' (1-based)")
     ap.add_argument("--overwrite", action="store_true", help="Overwrite existing files")
+    ap.add_argument("--bundle", action="store_true",
+                    help="Pack embedded images into one uncompressed images.tar instead of one file each")
+    ap.add_argument("--compat-safenames", action="store_true",
+                    help="Sanitize file names with the original regex instead of the translate table")
+    ap.add_argument("--dedupe-hardlink", action="store_true",
+                    help="Also save repeated images under their page's name, as hard links to the first copy")
+    ap.add_argument("--mmap", action="store_true",
+                    help="Read the PDF through a read-only memory map instead of file reads")
+    ap.add_argument("--workers", type=_int_at_least(0), default=1,
+                    help="Processes to decode/render pages with (default: 1, 0 = one per CPU)")
     ap.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     args = ap.parse_args()
 
@@ -158,6 +789,17 @@ def main():
         dpi=args.dpi,
         pages=args.pages,
         overwrite=args.overwrite,
+        workers=args.workers,
+        png_encoder=args.png_encoder,
+        png_level=args.png_level,
+        render_tile=args.render_tile,
+        max_dpi=args.max_dpi,
+        compat_safenames=args.compat_safenames,
+        page_format=args.format,
+        quality=args.jpeg_quality,
+        bundle=args.bundle,
+        use_mmap=args.mmap,
+        dedupe_hardlink=args.dedupe_hardlink,
     )
 
 